@@ -23,20 +23,100 @@ Handles conversion between Anthropic's native format (used by Claude Code)
 and Kiro's internal format.
 """
 
-from typing import Any, Dict, List, Optional
-from loguru import logger
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from kiro_gateway.anthropic_models import (
     AnthropicMessagesRequest,
     AnthropicMessage,
     AnthropicTool,
-    TextContent,
-    ToolUseContent,
-    ToolResultContent,
 )
 from kiro_gateway.config import get_internal_model_id
 
 
+# Shared empty result for content without tool uses or tool results
+_EMPTY: Tuple[()] = ()
+
+
+def _block_fields(block: Any) -> Optional[Dict[str, Any]]:
+    """
+    Get the fields of a content block.
+
+    Raw dict blocks are returned as is. A parsed Pydantic block keeps its fields
+    in __dict__ under the same keys as the raw block, so reading them directly
+    avoids the model attribute machinery.
+
+    Args:
+        block: Content block (dict or parsed model)
+
+    Returns:
+        Block fields, or None for values that are not blocks
+    """
+    if type(block) is dict:
+        return block
+    return getattr(block, "__dict__", None)
+
+
+def _scan_content(content: Any) -> Tuple[str, Sequence[Dict[str, Any]], Sequence[Dict[str, Any]]]:
+    """
+    Extract text, tool uses and tool results from Anthropic content in a single pass.
+
+    Args:
+        content: Content in Anthropic format (string or list of blocks)
+
+    Returns:
+        Tuple of (text, tool uses in Kiro format, tool results in Kiro format).
+        Missing tool uses and tool results are returned as a shared empty tuple.
+    """
+    # Plain string content is the most common case and has no blocks to walk
+    if type(content) is str:
+        return content, _EMPTY, _EMPTY
+
+    if not isinstance(content, list):
+        return str(content), _EMPTY, _EMPTY
+
+    text_parts: List[str] = []
+    tp_append = text_parts.append
+    # Tool lists are created on first match, since most messages have neither
+    tool_uses: Optional[List[Dict[str, Any]]] = None
+    tool_results: Optional[List[Dict[str, Any]]] = None
+
+    for block in content:
+        fields = _block_fields(block)
+        if fields is None:
+            continue
+
+        block_type = fields.get("type")
+        if block_type == "text":
+            tp_append(fields.get("text", ""))
+        elif block_type == "tool_use":
+            if tool_uses is None:
+                tool_uses = []
+            tool_uses.append({
+                "name": fields.get("name", ""),
+                "input": fields.get("input", {}),
+                "toolUseId": fields.get("id", "")
+            })
+        elif block_type == "tool_result":
+            result_content = fields.get("content", "")
+            result_type = type(result_content)
+            if result_type is str:
+                result_text = result_content
+            elif result_type is list:
+                result_text = extract_text_from_content(result_content)
+            else:
+                result_text = str(result_content)
+
+            if tool_results is None:
+                tool_results = []
+            tool_results.append({
+                "content": [{"text": result_text}],
+                "status": "error" if fields.get("is_error") else "success",
+                "toolUseId": fields.get("tool_use_id", "")
+            })
+
+    return "".join(text_parts), tool_uses or _EMPTY, tool_results or _EMPTY
+
+
 def extract_text_from_content(content: Any) -> str:
     """
     Extract text from Anthropic content format.
@@ -47,20 +127,16 @@ def extract_text_from_content(content: Any) -> str:
     Returns:
         Extracted text
     """
-    if isinstance(content, str):
+    if type(content) is str:
         return content
 
     if isinstance(content, list):
-        text_parts = []
-        for block in content:
-            if isinstance(block, dict):
-                if block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-                elif hasattr(block, "text"):
-                    text_parts.append(block.text)
-            elif hasattr(block, "type") and block.type == "text":
-                text_parts.append(block.text)
-        return "".join(text_parts)
+        # Text-only extraction doesn't need the full scan, so feed str.join directly
+        return "".join([
+            fields.get("text", "")
+            for fields in map(_block_fields, content)
+            if fields is not None and fields.get("type") == "text"
+        ])
 
     return str(content)
 
@@ -75,24 +151,7 @@ def extract_tool_uses_from_content(content: Any) -> List[Dict[str, Any]]:
     Returns:
         List of tool uses in Kiro format
     """
-    tool_uses = []
-
-    if isinstance(content, list):
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "tool_use":
-                tool_uses.append({
-                    "name": block.get("name", ""),
-                    "input": block.get("input", {}),
-                    "toolUseId": block.get("id", "")
-                })
-            elif hasattr(block, "type") and block.type == "tool_use":
-                tool_uses.append({
-                    "name": block.name,
-                    "input": block.input,
-                    "toolUseId": block.id
-                })
-
-    return tool_uses
+    return list(_scan_content(content)[1])
 
 
 def extract_tool_results_from_content(content: Any) -> List[Dict[str, Any]]:
@@ -105,41 +164,43 @@ def extract_tool_results_from_content(content: Any) -> List[Dict[str, Any]]:
     Returns:
         List of tool results in Kiro format
     """
-    tool_results = []
+    return list(_scan_content(content)[2])
 
-    if isinstance(content, list):
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "tool_result":
-                result_content = block.get("content", "")
-                if isinstance(result_content, list):
-                    result_text = extract_text_from_content(result_content)
-                else:
-                    result_text = str(result_content)
-
-                tool_results.append({
-                    "content": [{"text": result_text}],
-                    "status": "error" if block.get("is_error") else "success",
-                    "toolUseId": block.get("tool_use_id", "")
-                })
-            elif hasattr(block, "type") and block.type == "tool_result":
-                result_content = block.content
-                if isinstance(result_content, list):
-                    result_text = extract_text_from_content(result_content)
-                else:
-                    result_text = str(result_content)
-
-                tool_results.append({
-                    "content": [{"text": result_text}],
-                    "status": "error" if getattr(block, "is_error", False) else "success",
-                    "toolUseId": block.tool_use_id
-                })
-
-    return tool_results
+
+def _build_user_history_entry(content: Any, model_id: str, prefix: Optional[str] = None) -> Dict[str, Any]:
+    """Build a Kiro history entry for a user message, optionally prefixing its text."""
+    text_content, _, tool_results = _scan_content(content)
+    if prefix:
+        text_content = f"{prefix}\n\n{text_content}"
+
+    user_input: Dict[str, Any] = {
+        "content": text_content,
+        "modelId": model_id,
+        "origin": "AI_EDITOR",
+    }
+
+    if tool_results:
+        user_input["userInputMessageContext"] = {"toolResults": tool_results}
+
+    return {"userInputMessage": user_input}
+
+
+def _build_assistant_history_entry(content: Any) -> Dict[str, Any]:
+    """Build a Kiro history entry for an assistant message."""
+    text_content, tool_uses, _ = _scan_content(content)
+
+    assistant_response: Dict[str, Any] = {"content": text_content}
+
+    if tool_uses:
+        assistant_response["toolUses"] = tool_uses
+
+    return {"assistantResponseMessage": assistant_response}
 
 
 def build_kiro_history_from_anthropic(
     messages: List[AnthropicMessage],
-    model_id: str
+    model_id: str,
+    prepend_to_first: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Build Kiro history from Anthropic messages.
@@ -147,40 +208,20 @@ def build_kiro_history_from_anthropic(
     Args:
         messages: List of Anthropic messages
         model_id: Internal Kiro model ID
+        prepend_to_first: Text to prepend to the first message if it is a user message
+            (used for the system prompt)
 
     Returns:
         List of history entries in Kiro format
     """
-    history = []
+    history: List[Dict[str, Any]] = []
 
-    for msg in messages:
+    for index, msg in enumerate(messages):
         if msg.role == "user":
-            text_content = extract_text_from_content(msg.content)
-
-            user_input = {
-                "content": text_content,
-                "modelId": model_id,
-                "origin": "AI_EDITOR",
-            }
-
-            # Check for tool results
-            tool_results = extract_tool_results_from_content(msg.content)
-            if tool_results:
-                user_input["userInputMessageContext"] = {"toolResults": tool_results}
-
-            history.append({"userInputMessage": user_input})
-
+            prefix = prepend_to_first if index == 0 else None
+            history.append(_build_user_history_entry(msg.content, model_id, prefix))
         elif msg.role == "assistant":
-            text_content = extract_text_from_content(msg.content)
-
-            assistant_response = {"content": text_content}
-
-            # Check for tool uses
-            tool_uses = extract_tool_uses_from_content(msg.content)
-            if tool_uses:
-                assistant_response["toolUses"] = tool_uses
-
-            history.append({"assistantResponseMessage": assistant_response})
+            history.append(_build_assistant_history_entry(msg.content))
 
     return history
 
@@ -198,13 +239,12 @@ def convert_anthropic_tools_to_kiro(tools: Optional[List[AnthropicTool]]) -> Opt
     if not tools:
         return None
 
-    kiro_tools = []
+    kiro_tools: List[Dict[str, Any]] = []
     for tool in tools:
         # Convert input_schema to dict if it's a Pydantic model
-        if hasattr(tool.input_schema, "model_dump"):
-            input_schema = tool.input_schema.model_dump(exclude_none=True)
-        else:
-            input_schema = tool.input_schema
+        input_schema: Any = tool.input_schema
+        if hasattr(input_schema, "model_dump"):
+            input_schema = input_schema.model_dump(exclude_none=True)
 
         kiro_tools.append({
             "toolSpecification": {
@@ -242,41 +282,29 @@ def build_kiro_payload_from_anthropic(
     # Get internal model ID
     model_id = get_internal_model_id(request_data.model)
 
-    # Extract system prompt
-    system_prompt = ""
-    if request_data.system:
-        if isinstance(request_data.system, str):
-            system_prompt = request_data.system
-        elif isinstance(request_data.system, list):
-            system_prompt = extract_text_from_content(request_data.system)
+    # System prompt is flattened to a string during validation;
+    # lists that bypassed validation (model_construct, assignment) are flattened here
+    system_prompt = request_data.system or ""
+    if type(system_prompt) is not str:
+        system_prompt = extract_text_from_content(system_prompt)
 
     # Build history (all messages except the last one)
-    messages = list(request_data.messages)
-    history_messages = messages[:-1] if len(messages) > 1 else []
-
-    # Add system prompt to first user message in history if present
-    if system_prompt and history_messages:
-        first_msg = history_messages[0]
-        if first_msg.role == "user":
-            original_content = extract_text_from_content(first_msg.content)
-            # Create a modified copy
-            first_msg = AnthropicMessage(
-                role=first_msg.role,
-                content=f"{system_prompt}\n\n{original_content}"
-            )
-            history_messages[0] = first_msg
-
-    history = build_kiro_history_from_anthropic(history_messages, model_id)
+    messages = request_data.messages
+    history_messages = messages[:-1]
+
+    # System prompt is added to the first user message in history if present
+    history = build_kiro_history_from_anthropic(history_messages, model_id, system_prompt)
 
     # Current message (last one)
     current_message = messages[-1]
-    current_content = extract_text_from_content(current_message.content)
+    current_content, _, current_tool_results = _scan_content(current_message.content)
 
     # If system prompt exists but no history, add to current message
     if system_prompt and not history:
         current_content = f"{system_prompt}\n\n{current_content}"
 
-    # If current message is assistant, add to history and create "Continue" user message
+    # If current message is assistant, add to history and create "Continue" user message.
+    # Otherwise just ensure content is not empty.
     if current_message.role == "assistant":
         history.append({
             "assistantResponseMessage": {
@@ -284,52 +312,37 @@ def build_kiro_payload_from_anthropic(
             }
         })
         current_content = "Continue"
-
-    # Ensure content is not empty
-    if not current_content:
+        current_tool_results = _EMPTY
+    elif not current_content:
         current_content = "Continue"
 
-    # Build user input message
-    user_input_message = {
+    # Tools and tool results from current message, each included only if present
+    kiro_tools = convert_anthropic_tools_to_kiro(request_data.tools)
+
+    user_input_context: Dict[str, Any] = {}
+    if kiro_tools:
+        user_input_context["tools"] = kiro_tools
+    if current_tool_results:
+        user_input_context["toolResults"] = current_tool_results
+
+    user_input_message: Dict[str, Any] = {
         "content": current_content,
         "modelId": model_id,
         "origin": "AI_EDITOR",
     }
-
-    # Add tools and tool results if present
-    user_input_context = {}
-
-    # Add tools
-    if request_data.tools:
-        kiro_tools = convert_anthropic_tools_to_kiro(request_data.tools)
-        if kiro_tools:
-            user_input_context["tools"] = kiro_tools
-
-    # Add tool results from current message
-    if current_message.role == "user":
-        tool_results = extract_tool_results_from_content(current_message.content)
-        if tool_results:
-            user_input_context["toolResults"] = tool_results
-
     if user_input_context:
         user_input_message["userInputMessageContext"] = user_input_context
 
     # Build final payload
-    payload = {
-        "conversationState": {
-            "chatTriggerType": "MANUAL",
-            "conversationId": conversation_id,
-            "currentMessage": {
-                "userInputMessage": user_input_message
-            }
-        }
+    conversation_state: Dict[str, Any] = {
+        "chatTriggerType": "MANUAL",
+        "conversationId": conversation_id,
+        "currentMessage": {"userInputMessage": user_input_message},
     }
-
-    # Add history if not empty
     if history:
-        payload["conversationState"]["history"] = history
+        conversation_state["history"] = history
 
-    # Add profile ARN
+    payload: Dict[str, Any] = {"conversationState": conversation_state}
     if profile_arn:
         payload["profileArn"] = profile_arn
 
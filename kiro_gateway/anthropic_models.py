@@ -23,8 +23,8 @@ Defines data schemas for Claude Code and other Anthropic API clients.
 """
 
 import time
-from typing import Any, Dict, List, Optional, Union, Literal
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, List, Optional, Union, Literal
+from pydantic import BaseModel, Field, field_validator
 
 
 # ==================================================================================================
@@ -62,11 +62,15 @@ class ToolResultContent(BaseModel):
     """Tool result content block."""
     type: Literal["tool_result"] = "tool_result"
     tool_use_id: str
-    content: Union[str, List[Union[TextContent, ImageContent]]]
+    content: Union[str, List[Annotated[Union[TextContent, ImageContent], Field(discriminator="type")]]]
     is_error: Optional[bool] = None
 
 
-ContentBlock = Union[TextContent, ImageContent, ToolUseContent, ToolResultContent]
+# Discriminated by "type", so each block is validated against its own model only
+ContentBlock = Annotated[
+    Union[TextContent, ImageContent, ToolUseContent, ToolResultContent],
+    Field(discriminator="type")
+]
 
 
 # ==================================================================================================
@@ -128,7 +132,8 @@ class AnthropicMessagesRequest(BaseModel):
         model: Model identifier (e.g., "claude-sonnet-4-20250514")
         messages: List of messages
         max_tokens: Maximum tokens to generate
-        system: System prompt (optional)
+        system: System prompt (optional). A list of text blocks is flattened
+            to a single string during validation.
         temperature: Temperature for sampling (0-1)
         top_p: Top-p sampling parameter
         top_k: Top-k sampling parameter
@@ -158,6 +163,20 @@ class AnthropicMessagesRequest(BaseModel):
 
     model_config = {"extra": "allow"}
 
+    @field_validator("system", mode="after")
+    @classmethod
+    def _flatten_system(
+        cls, v: Optional[Union[str, List[TextContent]]]
+    ) -> Optional[str]:
+        """
+        Flatten a validated system prompt given as text blocks into a single string.
+
+        Done once at parse time so converters can use the value directly.
+        """
+        if isinstance(v, list):
+            return "".join(block.text for block in v)
+        return v
+
 
 # ==================================================================================================
 # Response Models
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit-тесты для конвертеров Anthropic <-> Kiro.
+Проверяет извлечение контента из блоков и построение payload.
+"""
+
+import pytest
+
+from kiro_gateway.anthropic_converters import (
+    _scan_content,
+    extract_text_from_content,
+    extract_tool_uses_from_content,
+    extract_tool_results_from_content,
+    build_kiro_history_from_anthropic,
+    build_kiro_payload_from_anthropic,
+    convert_anthropic_tools_to_kiro,
+)
+from kiro_gateway.anthropic_models import (
+    AnthropicMessage,
+    AnthropicMessagesRequest,
+    AnthropicTool,
+    AnthropicToolInputSchema,
+    TextContent,
+    ToolUseContent,
+    ToolResultContent,
+)
+
+
+class TestExtractTextFromContent:
+    """Тесты функции extract_text_from_content."""
+
+    def test_extracts_from_string(self):
+        """
+        Что он делает: Проверяет извлечение текста из строки.
+        Цель: Убедиться, что строка возвращается как есть.
+        """
+        print("Действие: Извлечение текста из строки...")
+        result = extract_text_from_content("Hello")
+
+        print(f"Сравниваем результат: Ожидалось 'Hello', Получено '{result}'")
+        assert result == "Hello"
+
+    def test_extracts_from_dict_blocks(self):
+        """
+        Что он делает: Проверяет извлечение из списка dict-блоков.
+        Цель: Убедиться, что учитываются только блоки с type=text.
+        """
+        print("Настройка: Смешанные dict-блоки...")
+        content = [
+            {"type": "text", "text": "Hello"},
+            {"type": "tool_use", "id": "t1", "name": "f", "input": {}},
+            {"type": "text", "text": " World"},
+        ]
+
+        print("Действие: Извлечение текста...")
+        result = extract_text_from_content(content)
+
+        print(f"Сравниваем результат: Ожидалось 'Hello World', Получено '{result}'")
+        assert result == "Hello World"
+
+    def test_extracts_from_pydantic_blocks(self):
+        """
+        Что он делает: Проверяет извлечение из Pydantic-блоков.
+        Цель: Убедиться, что TextContent обрабатывается наравне с dict.
+        """
+        print("Настройка: Pydantic-блоки...")
+        content = [
+            TextContent(text="Part1"),
+            ToolUseContent(id="t1", name="f", input={}),
+            {"type": "text", "text": "Part2"},
+        ]
+
+        print("Действие: Извлечение текста...")
+        result = extract_text_from_content(content)
+
+        print(f"Сравниваем результат: Ожидалось 'Part1Part2', Получено '{result}'")
+        assert result == "Part1Part2"
+
+    def test_converts_other_types_to_string(self):
+        """
+        Что он делает: Проверяет конвертацию других типов в строку.
+        Цель: Убедиться, что не-строки и не-списки приводятся к str.
+        """
+        print("Действие: Извлечение текста из числа...")
+        result = extract_text_from_content(42)
+
+        print(f"Сравниваем результат: Ожидалось '42', Получено '{result}'")
+        assert result == "42"
+
+
+class TestScanContent:
+    """Тесты функции _scan_content."""
+
+    def test_extracts_all_parts_in_one_call(self):
+        """
+        Что он делает: Проверяет извлечение текста, tool uses и tool results за один вызов.
+        Цель: Убедиться, что результат совпадает с отдельными extract_* функциями.
+        """
+        print("Настройка: Смешанные блоки...")
+        content = [
+            {"type": "text", "text": "Hello"},
+            ToolUseContent(id="t1", name="f", input={"x": 1}),
+            {"type": "tool_result", "tool_use_id": "t0", "content": "ok"},
+            TextContent(text=" World"),
+        ]
+
+        print("Действие: Сканирование контента...")
+        text, tool_uses, tool_results = _scan_content(content)
+
+        print(f"Результат: {text!r}, {tool_uses}, {tool_results}")
+        assert text == "Hello World"
+        assert tool_uses == extract_tool_uses_from_content(content)
+        assert tool_results == extract_tool_results_from_content(content)
+        assert tool_uses == [{"name": "f", "input": {"x": 1}, "toolUseId": "t1"}]
+        assert tool_results == [{"content": [{"text": "ok"}], "status": "success", "toolUseId": "t0"}]
+
+
+class TestExtractToolUsesFromContent:
+    """Тесты функции extract_tool_uses_from_content."""
+
+    def test_extracts_from_dict_and_pydantic_blocks(self):
+        """
+        Что он делает: Проверяет извлечение tool_use из dict и Pydantic блоков.
+        Цель: Убедиться, что оба формата конвертируются в формат Kiro.
+        """
+        print("Настройка: Блоки tool_use...")
+        content = [
+            {"type": "text", "text": "Calling tools"},
+            {"type": "tool_use", "id": "t1", "name": "get_weather", "input": {"city": "Moscow"}},
+            ToolUseContent(id="t2", name="get_time", input={}),
+        ]
+
+        print("Действие: Извлечение tool uses...")
+        result = extract_tool_uses_from_content(content)
+
+        print(f"Результат: {result}")
+        assert result == [
+            {"name": "get_weather", "input": {"city": "Moscow"}, "toolUseId": "t1"},
+            {"name": "get_time", "input": {}, "toolUseId": "t2"},
+        ]
+
+    def test_returns_empty_for_string(self):
+        """
+        Что он делает: Проверяет обработку строкового контента.
+        Цель: Убедиться, что для строки возвращается пустой список.
+        """
+        print("Действие: Извлечение tool uses из строки...")
+        result = extract_tool_uses_from_content("Hello")
+
+        print(f"Сравниваем результат: Ожидалось [], Получено {result}")
+        assert result == []
+
+
+class TestExtractToolResultsFromContent:
+    """Тесты функции extract_tool_results_from_content."""
+
+    def test_extracts_from_dict_blocks(self):
+        """
+        Что он делает: Проверяет извлечение tool_result из dict-блоков.
+        Цель: Убедиться, что строковый и списочный контент обрабатываются.
+        """
+        print("Настройка: Блоки tool_result...")
+        content = [
+            {"type": "tool_result", "tool_use_id": "t1", "content": "Sunny"},
+            {
+                "type": "tool_result",
+                "tool_use_id": "t2",
+                "content": [{"type": "text", "text": "Failed"}],
+                "is_error": True,
+            },
+        ]
+
+        print("Действие: Извлечение tool results...")
+        result = extract_tool_results_from_content(content)
+
+        print(f"Результат: {result}")
+        assert result == [
+            {"content": [{"text": "Sunny"}], "status": "success", "toolUseId": "t1"},
+            {"content": [{"text": "Failed"}], "status": "error", "toolUseId": "t2"},
+        ]
+
+    def test_extracts_from_pydantic_blocks(self):
+        """
+        Что он делает: Проверяет извлечение tool_result из Pydantic-блоков.
+        Цель: Убедиться, что ToolResultContent конвертируется в формат Kiro.
+        """
+        print("Настройка: ToolResultContent...")
+        content = [
+            ToolResultContent(tool_use_id="t1", content=[TextContent(text="42")]),
+        ]
+
+        print("Действие: Извлечение tool results...")
+        result = extract_tool_results_from_content(content)
+
+        print(f"Результат: {result}")
+        assert result == [
+            {"content": [{"text": "42"}], "status": "success", "toolUseId": "t1"},
+        ]
+
+
+class TestBuildKiroHistoryFromAnthropic:
+    """Тесты функции build_kiro_history_from_anthropic."""
+
+    def test_builds_user_and_assistant_entries(self):
+        """
+        Что он делает: Проверяет построение истории из user и assistant сообщений.
+        Цель: Убедиться, что tool uses и tool results попадают в нужные поля.
+        """
+        print("Настройка: Диалог с вызовом инструмента...")
+        messages = [
+            AnthropicMessage(role="user", content="What's the weather?"),
+            AnthropicMessage(role="assistant", content=[
+                {"type": "tool_use", "id": "t1", "name": "get_weather", "input": {}},
+            ]),
+            AnthropicMessage(role="user", content=[
+                {"type": "tool_result", "tool_use_id": "t1", "content": "Sunny"},
+            ]),
+        ]
+
+        print("Действие: Построение истории...")
+        history = build_kiro_history_from_anthropic(messages, "model-x")
+
+        print(f"Результат: {history}")
+        assert history[0] == {
+            "userInputMessage": {
+                "content": "What's the weather?",
+                "modelId": "model-x",
+                "origin": "AI_EDITOR",
+            }
+        }
+        assert history[1] == {
+            "assistantResponseMessage": {
+                "content": "",
+                "toolUses": [{"name": "get_weather", "input": {}, "toolUseId": "t1"}],
+            }
+        }
+        assert history[2]["userInputMessage"]["userInputMessageContext"] == {
+            "toolResults": [{"content": [{"text": "Sunny"}], "status": "success", "toolUseId": "t1"}]
+        }
+
+    def test_prepends_text_only_to_first_user_message(self):
+        """
+        Что он делает: Проверяет параметр prepend_to_first.
+        Цель: Убедиться, что текст добавляется только к первому user-сообщению.
+        """
+        print("Настройка: История, начинающаяся с user и с assistant...")
+        user_first = [
+            AnthropicMessage(role="user", content="Hi"),
+            AnthropicMessage(role="user", content="Again"),
+        ]
+        assistant_first = [AnthropicMessage(role="assistant", content="Hello")]
+
+        print("Действие: Построение истории с prepend_to_first...")
+        history = build_kiro_history_from_anthropic(user_first, "model-x", "System")
+        other = build_kiro_history_from_anthropic(assistant_first, "model-x", "System")
+
+        print(f"Результат: {history}, {other}")
+        assert history[0]["userInputMessage"]["content"] == "System\n\nHi"
+        assert history[1]["userInputMessage"]["content"] == "Again"
+        assert other == [{"assistantResponseMessage": {"content": "Hello"}}]
+
+    def test_skips_unknown_roles(self):
+        """
+        Что он делает: Проверяет обработку сообщений с неизвестной ролью.
+        Цель: Убедиться, что такие сообщения пропускаются, а не считаются assistant.
+        """
+        print("Настройка: Сообщение с ролью system между user и assistant...")
+        messages = [
+            AnthropicMessage(role="user", content="Hi"),
+            AnthropicMessage.model_construct(role="system", content="Ignored"),
+            AnthropicMessage(role="assistant", content="Hello"),
+        ]
+
+        print("Действие: Построение истории...")
+        history = build_kiro_history_from_anthropic(messages, "model-x")
+
+        print(f"Результат: {history}")
+        assert history == [
+            {"userInputMessage": {"content": "Hi", "modelId": "model-x", "origin": "AI_EDITOR"}},
+            {"assistantResponseMessage": {"content": "Hello"}},
+        ]
+
+
+class TestConvertAnthropicToolsToKiro:
+    """Тесты функции convert_anthropic_tools_to_kiro."""
+
+    def test_returns_none_for_empty_tools(self):
+        """
+        Что он делает: Проверяет обработку пустого списка tools.
+        Цель: Убедиться, что возвращается None.
+        """
+        print("Действие: Конвертация пустого списка...")
+        assert convert_anthropic_tools_to_kiro([]) is None
+        assert convert_anthropic_tools_to_kiro(None) is None
+
+    def test_converts_tools_to_tool_specifications(self):
+        """
+        Что он делает: Проверяет конвертацию tools в toolSpecification.
+        Цель: Убедиться, что input_schema сериализуется без None-полей.
+        """
+        print("Настройка: Два tools...")
+        tools = [
+            AnthropicTool(
+                name="search",
+                description="Search the web",
+                input_schema=AnthropicToolInputSchema(properties={"q": {"type": "string"}}),
+            ),
+            AnthropicTool(name="noop", description="Do nothing", input_schema=AnthropicToolInputSchema()),
+        ]
+
+        print("Действие: Конвертация...")
+        result = convert_anthropic_tools_to_kiro(tools)
+
+        print(f"Результат: {result}")
+        assert result == [
+            {
+                "toolSpecification": {
+                    "name": "search",
+                    "description": "Search the web",
+                    "inputSchema": {"json": {"type": "object", "properties": {"q": {"type": "string"}}}},
+                }
+            },
+            {
+                "toolSpecification": {
+                    "name": "noop",
+                    "description": "Do nothing",
+                    "inputSchema": {"json": {"type": "object"}},
+                }
+            },
+        ]
+
+
+class TestBuildKiroPayloadFromAnthropic:
+    """Тесты функции build_kiro_payload_from_anthropic."""
+
+    def test_builds_simple_payload(self):
+        """
+        Что он делает: Проверяет построение payload для одного сообщения.
+        Цель: Убедиться, что структура payload соответствует формату Kiro.
+        """
+        print("Настройка: Простой запрос...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            messages=[{"role": "user", "content": "Hello"}],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "arn:test")
+
+        print(f"Результат: {payload}")
+        assert payload == {
+            "conversationState": {
+                "chatTriggerType": "MANUAL",
+                "conversationId": "conv-1",
+                "currentMessage": {
+                    "userInputMessage": {
+                        "content": "Hello",
+                        "modelId": "CLAUDE_SONNET_4_5_20250929_V1_0",
+                        "origin": "AI_EDITOR",
+                    }
+                },
+            },
+            "profileArn": "arn:test",
+        }
+
+    def test_system_prompt_prepended_to_first_history_message(self):
+        """
+        Что он делает: Проверяет добавление system prompt к первому сообщению истории.
+        Цель: Убедиться, что system prompt не теряется при наличии истории.
+        """
+        print("Настройка: Запрос с system prompt и историей...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            system=[{"type": "text", "text": "Be brief."}],
+            messages=[
+                {"role": "user", "content": [{"type": "text", "text": "Hi"}]},
+                {"role": "assistant", "content": "Hello!"},
+                {"role": "user", "content": "How are you?"},
+            ],
+        )
+
+        print(f"Проверка: system из блоков сведен к строке: {request.system!r}")
+        assert request.system == "Be brief."
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        print(f"Результат: {payload}")
+        state = payload["conversationState"]
+        assert state["history"][0]["userInputMessage"]["content"] == "Be brief.\n\nHi"
+        assert state["currentMessage"]["userInputMessage"]["content"] == "How are you?"
+        assert "profileArn" not in payload
+
+    def test_system_prompt_keeps_tool_results_of_first_history_message(self):
+        """
+        Что он делает: Проверяет tool results первого сообщения истории при наличии system prompt.
+        Цель: Убедиться, что добавление system prompt не теряет toolResults.
+        """
+        print("Настройка: Первое сообщение истории с текстом и tool_result...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            system="Be brief.",
+            messages=[
+                {"role": "user", "content": [
+                    {"type": "text", "text": "Result:"},
+                    {"type": "tool_result", "tool_use_id": "t1", "content": "Sunny"},
+                ]},
+                {"role": "assistant", "content": "Noted."},
+                {"role": "user", "content": "Thanks"},
+            ],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        first_input = payload["conversationState"]["history"][0]["userInputMessage"]
+        print(f"Результат: {first_input}")
+        assert first_input["content"] == "Be brief.\n\nResult:"
+        assert first_input["userInputMessageContext"] == {
+            "toolResults": [{"content": [{"text": "Sunny"}], "status": "success", "toolUseId": "t1"}]
+        }
+
+    def test_system_prompt_prepended_to_current_message_without_history(self):
+        """
+        Что он делает: Проверяет добавление system prompt к текущему сообщению.
+        Цель: Убедиться, что без истории system prompt попадает в currentMessage.
+        """
+        print("Настройка: Запрос с system prompt без истории...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            system="Be brief.",
+            messages=[{"role": "user", "content": "Hi"}],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        content = payload["conversationState"]["currentMessage"]["userInputMessage"]["content"]
+        print(f"Сравниваем результат: Получено '{content}'")
+        assert content == "Be brief.\n\nHi"
+        assert "history" not in payload["conversationState"]
+
+    def test_unvalidated_system_blocks_are_flattened(self):
+        """
+        Что он делает: Проверяет system в виде списка блоков, минуя валидацию.
+        Цель: Убедиться, что в prompt попадает текст блоков, а не repr списка.
+        """
+        print("Настройка: Запрос через model_construct с system из text-блоков...")
+        request = AnthropicMessagesRequest.model_construct(
+            model="claude-sonnet-4-5",
+            system=[TextContent(text="Be "), TextContent(text="brief.")],
+            messages=[AnthropicMessage(role="user", content="Hi")],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        content = payload["conversationState"]["currentMessage"]["userInputMessage"]["content"]
+        print(f"Сравниваем результат: Получено '{content}'")
+        assert content == "Be brief.\n\nHi"
+
+    def test_trailing_assistant_message_becomes_continue(self):
+        """
+        Что он делает: Проверяет обработку assistant-сообщения в конце.
+        Цель: Убедиться, что оно уходит в историю, а текущее сообщение - "Continue".
+        """
+        print("Настройка: Запрос, заканчивающийся assistant-сообщением...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            messages=[
+                {"role": "user", "content": "Hi"},
+                {"role": "assistant", "content": "Hello"},
+            ],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        state = payload["conversationState"]
+        print(f"Результат: {state}")
+        assert state["history"][-1] == {"assistantResponseMessage": {"content": "Hello"}}
+        assert state["currentMessage"]["userInputMessage"]["content"] == "Continue"
+
+    def test_tools_and_tool_results_in_context(self):
+        """
+        Что он делает: Проверяет добавление tools и tool results в контекст.
+        Цель: Убедиться, что userInputMessageContext заполняется корректно.
+        """
+        print("Настройка: Запрос с tools и tool_result...")
+        request = AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            tools=[
+                AnthropicTool(
+                    name="get_weather",
+                    description="Get weather",
+                    input_schema=AnthropicToolInputSchema(
+                        properties={"city": {"type": "string"}},
+                        required=["city"],
+                    ),
+                )
+            ],
+            messages=[
+                {"role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": "t1", "content": "Sunny"},
+                ]},
+            ],
+        )
+
+        print("Действие: Построение payload...")
+        payload = build_kiro_payload_from_anthropic(request, "conv-1", "")
+
+        user_input = payload["conversationState"]["currentMessage"]["userInputMessage"]
+        print(f"Результат: {user_input}")
+        assert user_input["content"] == "Continue"
+        assert user_input["userInputMessageContext"] == {
+            "tools": [{
+                "toolSpecification": {
+                    "name": "get_weather",
+                    "description": "Get weather",
+                    "inputSchema": {"json": {
+                        "type": "object",
+                        "properties": {"city": {"type": "string"}},
+                        "required": ["city"],
+                    }},
+                }
+            }],
+            "toolResults": [{"content": [{"text": "Sunny"}], "status": "success", "toolUseId": "t1"}],
+        }
+
+    def test_raises_on_empty_messages(self):
+        """
+        Что он делает: Проверяет обработку запроса без сообщений.
+        Цель: Убедиться, что выбрасывается ValueError.
+        """
+        print("Настройка: Запрос без сообщений...")
+        request = AnthropicMessagesRequest.model_construct(model="claude-sonnet-4-5", messages=[])
+
+        print("Действие: Построение payload...")
+        with pytest.raises(ValueError, match="No messages provided"):
+            build_kiro_payload_from_anthropic(request, "conv-1", "")
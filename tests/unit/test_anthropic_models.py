@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit-тесты для Pydantic моделей Anthropic Messages API.
+Проверяет валидацию content-блоков и запросов.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from kiro_gateway.anthropic_models import (
+    AnthropicMessage,
+    AnthropicMessagesRequest,
+    ImageContent,
+    TextContent,
+    ToolResultContent,
+    ToolUseContent,
+)
+
+
+class TestContentBlockDiscrimination:
+    """Тесты выбора модели content-блока по полю type."""
+
+    def test_tagged_blocks_parse_to_matching_classes(self):
+        """
+        Что он делает: Проверяет разбор блоков с полем type.
+        Цель: Убедиться, что каждый блок становится экземпляром своей модели.
+        """
+        print("Настройка: Сообщение со всеми типами блоков...")
+        message = AnthropicMessage(role="user", content=[
+            {"type": "text", "text": "Hello"},
+            {"type": "image", "source": {"media_type": "image/png", "data": "AAAA"}},
+            {"type": "tool_use", "id": "t1", "name": "f", "input": {}},
+            {"type": "tool_result", "tool_use_id": "t1", "content": "ok"},
+        ])
+
+        types = [type(block) for block in message.content]
+        print(f"Результат: {types}")
+        assert types == [TextContent, ImageContent, ToolUseContent, ToolResultContent]
+
+    def test_nested_tool_result_content_parses_to_matching_classes(self):
+        """
+        Что он делает: Проверяет разбор вложенного контента tool_result.
+        Цель: Убедиться, что вложенные text и image блоки тоже различаются по type.
+        """
+        print("Настройка: tool_result со списком блоков...")
+        message = AnthropicMessage(role="user", content=[
+            {
+                "type": "tool_result",
+                "tool_use_id": "t1",
+                "content": [
+                    {"type": "text", "text": "Chart:"},
+                    {"type": "image", "source": {"media_type": "image/png", "data": "AAAA"}},
+                ],
+            },
+        ])
+
+        nested = message.content[0].content
+        print(f"Результат: {nested}")
+        assert [type(block) for block in nested] == [TextContent, ImageContent]
+        assert nested[0].text == "Chart:"
+
+    def test_untagged_block_is_rejected(self):
+        """
+        Что он делает: Проверяет блок без поля type.
+        Цель: Убедиться, что такой блок не принимается молча за TextContent.
+        """
+        print("Действие: Сообщение с блоком без type...")
+        with pytest.raises(ValidationError):
+            AnthropicMessage(role="user", content=[{"text": "Hello"}])
+
+    def test_untagged_nested_tool_result_block_is_rejected(self):
+        """
+        Что он делает: Проверяет вложенный блок tool_result без поля type.
+        Цель: Убедиться, что дискриминатор применяется и к вложенному контенту.
+        """
+        print("Действие: tool_result с вложенным блоком без type...")
+        with pytest.raises(ValidationError):
+            AnthropicMessage(role="user", content=[
+                {"type": "tool_result", "tool_use_id": "t1", "content": [{"text": "ok"}]},
+            ])
+
+    def test_unknown_block_type_is_rejected(self):
+        """
+        Что он делает: Проверяет блок с неизвестным type.
+        Цель: Убедиться, что неизвестные типы блоков отклоняются.
+        """
+        print("Действие: Сообщение с блоком неизвестного типа...")
+        with pytest.raises(ValidationError):
+            AnthropicMessage(role="user", content=[{"type": "video", "url": "x"}])
+
+
+class TestAnthropicMessagesRequestSystem:
+    """Тесты валидации поля system в AnthropicMessagesRequest."""
+
+    def _build_request(self, system):
+        return AnthropicMessagesRequest(
+            model="claude-sonnet-4-5",
+            messages=[{"role": "user", "content": "Hi"}],
+            system=system,
+        )
+
+    def test_keeps_string_and_none(self):
+        """
+        Что он делает: Проверяет system в виде строки и None.
+        Цель: Убедиться, что такие значения сохраняются как есть.
+        """
+        print("Действие: Запросы со строкой и без system...")
+        assert self._build_request("Be brief.").system == "Be brief."
+        assert self._build_request(None).system is None
+
+    def test_flattens_text_blocks_to_string(self):
+        """
+        Что он делает: Проверяет system в виде списка text-блоков.
+        Цель: Убедиться, что блоки объединяются в одну строку при валидации.
+        """
+        print("Настройка: system из нескольких text-блоков...")
+        request = self._build_request([
+            {"type": "text", "text": "Be brief. ", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "Be kind."},
+        ])
+
+        print(f"Сравниваем результат: Получено {request.system!r}")
+        assert request.system == "Be brief. Be kind."
+
+    @pytest.mark.parametrize("system", [
+        123,
+        {"type": "text", "text": "hi"},
+        [1, 2],
+        ["abc"],
+        [{"foo": 1}],
+        [{"type": "image", "source": {"media_type": "image/png", "data": "AAAA"}}],
+    ])
+    def test_rejects_invalid_system(self, system):
+        """
+        Что он делает: Проверяет system неподдерживаемой формы.
+        Цель: Убедиться, что такие значения отклоняются, а не сводятся к строке.
+        """
+        print(f"Действие: Запрос с system={system!r}...")
+        with pytest.raises(ValidationError):
+            self._build_request(system)